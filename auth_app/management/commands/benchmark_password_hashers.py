@@ -0,0 +1,43 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+BENCHMARK_PASSWORD = 'Bench@1234'
+DEFAULT_ROUNDS = 20
+
+
+class Command(BaseCommand):
+    help = 'Report password verifications (logins) per second per worker for each hasher policy.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS)
+        parser.add_argument(
+            '--policy',
+            action='append',
+            choices=list(settings.PASSWORD_HASHER_POLICIES),
+            help='Limit to the given policy (repeatable).'
+        )
+
+    def handle(self, *args, **options):
+        rounds = options['rounds']
+        policies = options['policy'] or list(settings.PASSWORD_HASHER_POLICIES)
+
+        for policy in policies:
+            hasher = import_string(settings.PASSWORD_HASHER_POLICIES[policy])()
+            try:
+                encoded = hasher.encode(BENCHMARK_PASSWORD, hasher.salt())
+            except ValueError as e:
+                self.stdout.write(self.style.WARNING(f'{policy}: skipped ({e})'))
+                continue
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                hasher.verify(BENCHMARK_PASSWORD, encoded)
+            elapsed = time.perf_counter() - start
+
+            marker = ' (active)' if policy == settings.PASSWORD_HASHER_POLICY else ''
+            self.stdout.write(
+                f'{policy}{marker}: {rounds / elapsed:.1f} logins/sec per worker '
+                f'({elapsed / rounds * 1000:.1f} ms per verification)'
+            )
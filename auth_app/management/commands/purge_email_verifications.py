@@ -0,0 +1,40 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from auth_app.models import EmailVerification, VERIFIED_EMAIL_RETENTION_HOURS
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Delete expired email verification codes in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            '--verified-retention-hours',
+            type=int,
+            default=VERIFIED_EMAIL_RETENTION_HOURS,
+            help='How long a verified email stays usable for registration after its code expired.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        now = timezone.now()
+        verified_cutoff = now - timedelta(hours=options['verified_retention_hours'])
+
+        stale = EmailVerification.objects.filter(
+            Q(expires_at__isnull=True)
+            | Q(is_verified=False, expires_at__lte=now)
+            | Q(is_verified=True, expires_at__lte=verified_cutoff)
+        ).order_by('id')
+
+        deleted = 0
+        while True:
+            ids = list(stale.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted += EmailVerification.objects.filter(id__in=ids).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} stale verification records.'))
@@ -0,0 +1,48 @@
+from datetime import timedelta
+from django.db import migrations, models
+from django.db.models import F
+
+# Code lifetime at the time of this migration (VERIFICATION_CODE_EXPIRY_SECONDS).
+VERIFICATION_CODE_EXPIRY_SECONDS = 120
+
+
+def backfill_expires_at(apps, schema_editor):
+    # Existing rows predate expires_at; derive it from created_at so verified
+    # but not yet registered emails stay usable within the retention window.
+    EmailVerification = apps.get_model('auth_app', 'EmailVerification')
+    EmailVerification.objects.filter(expires_at__isnull=True, created_at__isnull=False).update(
+        expires_at=F('created_at') + timedelta(seconds=VERIFICATION_CODE_EXPIRY_SECONDS)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailverification',
+            name='expires_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(backfill_expires_at, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='emailverification',
+            name='is_expired',
+        ),
+        migrations.AlterField(
+            model_name='emailverification',
+            name='code',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name='emailverification',
+            index=models.Index(fields=['email', 'is_verified'], name='emailverif_email_verified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emailverification',
+            index=models.Index(fields=['expires_at'], name='emailverif_expires_at_idx'),
+        ),
+    ]
@@ -1,6 +1,10 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
+# How long a verified email stays usable for registration after its code expired.
+VERIFIED_EMAIL_RETENTION_HOURS = 24
+
 
 class BaseModel(models.Model):
     status = models.BooleanField(default=True)
@@ -21,7 +25,17 @@ class UserRole(BaseModel):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='user_detail')
     
 class EmailVerification(BaseModel):
-    code = models.IntegerField(null=True)
+    code = models.PositiveSmallIntegerField(null=True)
     is_verified = models.BooleanField(default=False)
-    is_expired = models.BooleanField(default=False)
+    expires_at = models.DateTimeField(null=True)
     email = models.CharField(max_length=100)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['email', 'is_verified'], name='emailverif_email_verified_idx'),
+            models.Index(fields=['expires_at'], name='emailverif_expires_at_idx'),
+        ]
+
+    @property
+    def is_expired(self):
+        return self.expires_at is None or self.expires_at <= timezone.now()
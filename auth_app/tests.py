@@ -1,12 +1,15 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth.models import User
 from django.urls import reverse
+from django.core.management import call_command
+from django.contrib.auth.hashers import make_password
 from django.utils import timezone
 from unittest.mock import patch
 from datetime import timedelta
+from io import StringIO
 import json
 
-from .models import Verification, Role
+from .models import EmailVerification as Verification, UserRole as Role
 
 
 class AuthFlowTests(TestCase):
@@ -32,7 +35,7 @@ class AuthFlowTests(TestCase):
         self.assertEqual(response.status_code, 400)
         self.assertIn("verify your email", response.json()["message"].lower())
 
-    @patch('user_auth.views.get_connection')
+    @patch('auth_app.views.get_connection')
     def test_request_email_verification_code(self, mock_conn):
         mock_conn.return_value = None
         response = self._post_json(self.verify_url, {"email": self.user_data["email"]})
@@ -41,20 +44,20 @@ class AuthFlowTests(TestCase):
         self.assertTrue(Verification.objects.filter(email=self.user_data["email"]).exists())
 
     def test_email_verification_successful(self):
-        Verification.objects.create(email=self.user_data["email"], code="1234", is_expired=False)
+        Verification.objects.create(email=self.user_data["email"], code="1234", expires_at=timezone.now() + timedelta(minutes=2))
         response = self._post_json(self.verify_url, {"email": self.user_data["email"], "code": "1234"})
         self.assertEqual(response.status_code, 200)
         self.assertIn("verified", response.json()["message"].lower())
-        self.assertTrue(Verification.objects.get(email=self.user_data["email"]).is_expired)
+        self.assertTrue(Verification.objects.get(email=self.user_data["email"]).is_verified)
 
     def test_email_verification_invalid_code(self):
-        Verification.objects.create(email=self.user_data["email"], code="9999", is_expired=False)
+        Verification.objects.create(email=self.user_data["email"], code="9999", expires_at=timezone.now() + timedelta(minutes=2))
         response = self._post_json(self.verify_url, {"email": self.user_data["email"], "code": "1234"})
         self.assertEqual(response.status_code, 400)
         self.assertIn("not correct", response.json()["message"].lower())
 
     def test_successful_registration_after_verification(self):
-        Verification.objects.create(email=self.user_data["email"], code="1234", is_expired=True, is_verified=True)
+        Verification.objects.create(email=self.user_data["email"], code="1234", is_verified=True, expires_at=timezone.now())
         response = self._post_json(self.register_url, self.user_data)
         self.assertEqual(response.status_code, 200)
         self.assertTrue(User.objects.filter(email=self.user_data["email"]).exists())
@@ -66,7 +69,7 @@ class AuthFlowTests(TestCase):
         self.assertIn("invalid role", response.json()["message"].lower())
 
     def test_weak_password_rejected(self):
-        Verification.objects.create(email=self.user_data["email"], is_expired=True, is_verified=True)
+        Verification.objects.create(email=self.user_data["email"], is_verified=True, expires_at=timezone.now())
         weak_data = {**self.user_data, "password": "weak"}
         response = self._post_json(self.register_url, weak_data)
         self.assertEqual(response.status_code, 400)
@@ -91,6 +94,19 @@ class AuthFlowTests(TestCase):
         self.assertEqual(response.status_code, 403)
         self.assertIn("incorrect credentials", response.json()["message"].lower())
 
+    @override_settings(
+        PASSWORD_HASHERS=['auth_app.hashers.TunablePBKDF2PasswordHasher', 'django.contrib.auth.hashers.MD5PasswordHasher'],
+        PBKDF2_ITERATIONS=1000
+    )
+    def test_login_upgrades_password_hash(self):
+        user = User.objects.create(username=self.user_data["email"], email=self.user_data["email"])
+        user.password = make_password(self.user_data["password"], hasher='md5')
+        user.save()
+        response = self._post_json(self.login_url, {"email": self.user_data["email"], "password": self.user_data["password"]})
+        self.assertEqual(response.status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$1000$"))
+
     def test_logout_successful(self):
         user = User.objects.create_user(username=self.user_data["email"], email=self.user_data["email"], password=self.user_data["password"])
         self.client.force_login(user)
@@ -104,20 +120,36 @@ class AuthFlowTests(TestCase):
         self.assertIn("not authenticated", response.json()["message"].lower())
 
     def test_verification_code_expired(self):
-        expired_time = timezone.now() - timedelta(minutes=3)
         Verification.objects.create(
             email=self.user_data["email"],
             code="1234",
-            is_expired=False,
-            created_at=expired_time
+            expires_at=timezone.now() - timedelta(minutes=1)
         )
-        with patch('user_auth.views.datetime') as mock_datetime:
-            mock_datetime.datetime.now.return_value = timezone.now()
-            response = self._post_json(self.verify_url, {"email": self.user_data["email"], "code": "1234"})
+        response = self._post_json(self.verify_url, {"email": self.user_data["email"], "code": "1234"})
         self.assertEqual(response.status_code, 400)
-        self.assertIn("expired code", response.json()["message"].lower())
+        self.assertIn("verification code expired", response.json()["message"].lower())
 
     def test_verification_fails_if_code_does_not_exist(self):
         response = self._post_json(self.verify_url, {"email": self.user_data["email"], "code": "1234"})
         self.assertEqual(response.status_code, 400)
         self.assertIn("does not exist", response.json()["message"].lower())
+
+    def test_purge_email_verifications_removes_stale_codes(self):
+        now = timezone.now()
+        Verification.objects.create(email="pending@example.com", code="1111", expires_at=now + timedelta(minutes=2))
+        Verification.objects.create(email="stale@example.com", code="2222", expires_at=now - timedelta(minutes=1))
+        Verification.objects.create(email="old@example.com", code="3333", is_verified=True, expires_at=now - timedelta(days=2))
+        Verification.objects.create(email="recent@example.com", code="4444", is_verified=True, expires_at=now - timedelta(minutes=1))
+        out = StringIO()
+        call_command('purge_email_verifications', batch_size=1, stdout=out)
+        self.assertIn("Deleted 2 stale verification records.", out.getvalue())
+        self.assertEqual(
+            set(Verification.objects.values_list('email', flat=True)),
+            {"pending@example.com", "recent@example.com"}
+        )
+
+    def test_registration_rejects_verification_past_retention(self):
+        Verification.objects.create(email=self.user_data["email"], code="1234", is_verified=True, expires_at=timezone.now() - timedelta(days=2))
+        response = self._post_json(self.register_url, self.user_data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("verify your email", response.json()["message"].lower())
@@ -1,12 +1,13 @@
 from django.contrib.auth import login, authenticate, logout
 from django.http import JsonResponse
 from django.contrib.auth.models import User
-from .models import EmailVerification, UserRole
+from .models import EmailVerification, UserRole, VERIFIED_EMAIL_RETENTION_HOURS
 import json
 import re
 import random
-import datetime
+from datetime import timedelta
 from django.conf import settings
+from django.utils import timezone
 from django.core.mail import EmailMessage, get_connection
 from django.views.decorators.csrf import csrf_exempt
 
@@ -50,8 +51,8 @@ def register_user(request):
     if User.objects.filter(email=email).exists():
         return JsonResponse({'message': 'Email already exists.'}, status=400)
 
-    verified = EmailVerification.objects.filter(email=email, is_verified=True, is_expired=True).last()
-    if not verified:
+    verified_cutoff = timezone.now() - timedelta(hours=VERIFIED_EMAIL_RETENTION_HOURS)
+    if not EmailVerification.objects.filter(email=email, is_verified=True, expires_at__gt=verified_cutoff).exists():
         return JsonResponse({'message': 'First verify your email.'}, status=400)
 
     if not is_valid_password(password):
@@ -66,6 +67,7 @@ def register_user(request):
         first_name=name
     )
     UserRole.objects.create(user=user, role=role)
+    EmailVerification.objects.filter(email=email).delete()
 
     return JsonResponse({'message': 'Registration successful!'}, status=200)
 
@@ -77,15 +79,15 @@ def login_user(request):
     email = data.get('email')
     password = data.get('password')
 
-    user = User.objects.filter(email=email).first()
-    if not user or not user.check_password(password):
+    # authenticate() is the only password check: it still runs the hasher for
+    # unknown emails, and rehashes with the preferred hasher when it changed.
+    username = User.objects.filter(email=email).values_list('username', flat=True).first()
+    auth_user = authenticate(request, username=username or email, password=password)
+    if not auth_user:
         return JsonResponse({'message': 'Incorrect credentials'}, status=403)
 
-    auth_user = authenticate(request, username=user.username, password=password)
-    if auth_user:
-        login(request, auth_user)
-        return JsonResponse({'message': 'Login successful'})
-    return JsonResponse({'message': 'Authentication failed.'}, status=403)
+    login(request, auth_user)
+    return JsonResponse({'message': 'Login successful'})
 
 def logout_user(request):
     if request.method != 'GET':
@@ -107,7 +109,12 @@ def verify_email(request):
 
     if email and not code:
         verification_code = str(random.randint(1000, 9999))
-        EmailVerification.objects.create(email=email, code=verification_code)
+        EmailVerification.objects.filter(email=email, is_verified=False).delete()
+        EmailVerification.objects.create(
+            email=email,
+            code=verification_code,
+            expires_at=timezone.now() + timedelta(seconds=VERIFICATION_CODE_EXPIRY_SECONDS)
+        )
         try:
             send_verification_email(email, verification_code)
             return JsonResponse({"message": "Verification code sent to email."}, status=200)
@@ -115,22 +122,18 @@ def verify_email(request):
             return JsonResponse({"error": f"Failed to send email: {str(e)}"}, status=500)
 
     elif email and code:
-        record = EmailVerification.objects.filter(email=email, is_expired=False).last()
+        record = EmailVerification.objects.filter(email=email, is_verified=False).last()
         if not record:
             return JsonResponse({"message": "Verification code not found or expired."}, status=400)
 
         if str(record.code) != str(code):
             return JsonResponse({"message": "Incorrect verification code."}, status=400)
 
-        now = datetime.datetime.now(record.created_at.tzinfo)
-        if (now - record.created_at).seconds > VERIFICATION_CODE_EXPIRY_SECONDS:
-            record.is_expired = True
-            record.save()
+        if record.is_expired:
             return JsonResponse({"message": "Verification code expired."}, status=400)
 
         record.is_verified = True
-        record.is_expired = True
-        record.save()
+        record.save(update_fields=['is_verified', 'updated_at'])
         return JsonResponse({"message": "Email verified successfully."}, status=200)
 
     return JsonResponse({"message": "Email is required."}, status=400)
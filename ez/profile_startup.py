@@ -0,0 +1,74 @@
+"""
+Import-time profile of a worker boot.
+
+Starts a fresh interpreter with ``-X importtime``, loads the WSGI application
+and the URLconf (what a Gunicorn worker does before serving its first
+request), and prints the boot time plus the most expensive imports.
+
+Usage::
+
+    python -m ezshare.profile_startup --settings ezshare.settings_production
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+BOOT_SCRIPT = """
+import time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+get_wsgi_application()
+get_resolver().url_patterns
+print(time.perf_counter() - start)
+"""
+
+
+def parse_importtime(stderr):
+    """Return (module, self_us, cumulative_us) rows from ``-X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--settings', default=os.environ.get('DJANGO_SETTINGS_MODULE', 'ezshare.settings'))
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': args.settings}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+        env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+
+    rows = parse_importtime(result.stderr)
+    by_package = defaultdict(int)
+    for module, self_us, _ in rows:
+        by_package[module.split('.')[0]] += self_us
+
+    print(f'Settings: {args.settings}')
+    print(f'Boot time: {float(result.stdout.split()[-1]) * 1000:.1f} ms')
+    print(f'Modules imported: {len(rows)}, import time: {sum(r[1] for r in rows) / 1000:.1f} ms')
+
+    print('\nSelf import time by top-level package (ms):')
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f'  {self_us / 1000:8.1f}  {package}')
+
+    print('\nSlowest modules by cumulative import time (ms):')
+    for module, _, cumulative_us in sorted(rows, key=lambda row: -row[2])[:args.top]:
+        print(f'  {cumulative_us / 1000:8.1f}  {module}')
+
+
+if __name__ == '__main__':
+    main()
@@ -12,7 +12,9 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 
 from pathlib import Path
+from importlib.util import find_spec
 from dotenv import load_dotenv
+from django.core.exceptions import ImproperlyConfigured
 import os
 import pymysql
 pymysql.install_as_MySQLdb()
@@ -117,6 +119,39 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# The first entry of PASSWORD_HASHERS hashes new passwords; the others still
+# verify existing hashes, which are upgraded transparently on the next login.
+
+PASSWORD_HASHER_POLICIES = {
+    'pbkdf2': 'auth_app.hashers.TunablePBKDF2PasswordHasher',
+    'scrypt': 'auth_app.hashers.TunableScryptPasswordHasher',
+    'argon2': 'auth_app.hashers.TunableArgon2PasswordHasher',
+}
+# Optional libraries a policy needs (pip install argon2-cffi for argon2).
+PASSWORD_HASHER_LIBRARIES = {
+    'argon2': 'argon2',
+}
+PASSWORD_HASHER_POLICY = os.environ.get('PASSWORD_HASHER_POLICY', 'pbkdf2')
+if PASSWORD_HASHER_POLICY not in PASSWORD_HASHER_POLICIES:
+    raise ImproperlyConfigured(
+        f"Unknown PASSWORD_HASHER_POLICY {PASSWORD_HASHER_POLICY!r}; choose one of {', '.join(PASSWORD_HASHER_POLICIES)}."
+    )
+if PASSWORD_HASHER_POLICY in PASSWORD_HASHER_LIBRARIES and not find_spec(PASSWORD_HASHER_LIBRARIES[PASSWORD_HASHER_POLICY]):
+    raise ImproperlyConfigured(
+        f"PASSWORD_HASHER_POLICY {PASSWORD_HASHER_POLICY!r} needs the "
+        f"{PASSWORD_HASHER_LIBRARIES[PASSWORD_HASHER_POLICY]!r} library, which is not installed."
+    )
+
+PASSWORD_HASHERS = [PASSWORD_HASHER_POLICIES[PASSWORD_HASHER_POLICY]] + [
+    hasher for policy, hasher in PASSWORD_HASHER_POLICIES.items() if policy != PASSWORD_HASHER_POLICY
+]
+
+PBKDF2_ITERATIONS = int(os.environ.get('PBKDF2_ITERATIONS', 1000000))
+SCRYPT_WORK_FACTOR = int(os.environ.get('SCRYPT_WORK_FACTOR', 2 ** 14))
+ARGON2_TIME_COST = int(os.environ.get('ARGON2_TIME_COST', 2))
+ARGON2_MEMORY_COST = int(os.environ.get('ARGON2_MEMORY_COST', 102400))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -149,6 +184,10 @@ SESSION_COOKIE_HTTPONLY = True
 
 
 
+# Per-user storage quota for uploads, in KB (default 1 GB).
+STORAGE_QUOTA_KB = int(os.environ.get('STORAGE_QUOTA_KB', 1024 * 1024))
+
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = os.environ.get('EMAIL_HOST')
 EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
@@ -0,0 +1,40 @@
+"""
+Lean production settings for ezshare.
+
+Extends the base settings and drops the apps and middleware the API never
+uses (admin, messages), so each worker imports and initializes less on boot.
+Select it with DJANGO_SETTINGS_MODULE=ezshare.settings_production.
+"""
+
+import os
+from copy import deepcopy
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+# Admin URLs are disabled and the JSON API never renders flash messages.
+UNUSED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.messages',
+]
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in UNUSED_APPS]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware != 'django.contrib.messages.middleware.MessageMiddleware'
+]
+
+# Copy before editing so the base settings module keeps its own TEMPLATES.
+TEMPLATES = deepcopy(TEMPLATES)
+TEMPLATES[0]['OPTIONS']['context_processors'] = [
+    processor for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+    if processor != 'django.contrib.messages.context_processors.messages'
+]
+
+# The Fernet cipher is built lazily on first download; fail at boot instead
+# of on the first request when its key is missing.
+if not os.environ.get('FERNET_KEY'):
+    raise ImproperlyConfigured("FERNET_KEY environment variable not set.")
@@ -1,8 +1,6 @@
-from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.urls import path, include
 
 urlpatterns = [
    # path('admin/', admin.site.urls),
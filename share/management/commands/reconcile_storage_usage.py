@@ -0,0 +1,53 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from share.models import File, StorageUsage
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-user storage usage from active files, in batches of users.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        reconciled = 0
+
+        while True:
+            user_ids = list(
+                User.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not user_ids:
+                break
+            last_id = user_ids[-1]
+
+            with transaction.atomic():
+                # Make sure every user has a row (reserve() may create one
+                # concurrently), then lock the rows so no reservation or
+                # release lands between counting and writing. Uploads reserve
+                # and insert their File row in one transaction, so counting
+                # after the lock sees every committed reservation.
+                StorageUsage.objects.bulk_create(
+                    [StorageUsage(user_id=user_id) for user_id in user_ids],
+                    ignore_conflicts=True
+                )
+                usages = list(StorageUsage.objects.select_for_update().filter(user_id__in=user_ids))
+                totals = {
+                    row['owner_id']: row
+                    for row in File.objects.filter(owner_id__in=user_ids, status=True)
+                    .values('owner_id')
+                    .annotate(used_kb=Sum('file_size_kb'), file_count=Count('id'))
+                }
+                for usage in usages:
+                    total = totals.get(usage.user_id, {})
+                    usage.used_kb = total.get('used_kb') or 0
+                    usage.file_count = total.get('file_count') or 0
+                StorageUsage.objects.bulk_update(usages, ['used_kb', 'file_count'])
+            reconciled += len(user_ids)
+
+        self.stdout.write(self.style.SUCCESS(f'Reconciled storage usage for {reconciled} users.'))
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('share', '0003_file_updated_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='file',
+            old_name='file_name',
+            new_name='file',
+        ),
+        migrations.AlterField(
+            model_name='file',
+            name='file',
+            field=models.FileField(blank=True, null=True, upload_to='user_files/'),
+        ),
+        migrations.AlterField(
+            model_name='file',
+            name='file_size_kb',
+            field=models.BigIntegerField(help_text='Size in KB', null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def backfill_storage_usage(apps, schema_editor):
+    # Usage counters start from existing active files, so current owners do
+    # not get their full quota back when quota enforcement ships.
+    File = apps.get_model('share', 'File')
+    StorageUsage = apps.get_model('share', 'StorageUsage')
+    totals = (
+        File.objects.filter(status=True, owner__isnull=False)
+        .values('owner_id')
+        .annotate(used_kb=Sum('file_size_kb'), file_count=Count('id'))
+    )
+    existing_ids = set(StorageUsage.objects.values_list('user_id', flat=True))
+    StorageUsage.objects.bulk_create(
+        [
+            StorageUsage(user_id=row['owner_id'], used_kb=row['used_kb'] or 0, file_count=row['file_count'])
+            for row in totals
+            if row['owner_id'] not in existing_ids
+        ],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('share', '0004_rename_file_name_file'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_storage_usage, migrations.RunPython.noop),
+    ]
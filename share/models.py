@@ -1,12 +1,55 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
 from django.contrib.auth.models import User
 from auth_app.models import BaseModel
 
+class StorageUsage(BaseModel):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='storage_usage')
+    used_kb = models.BigIntegerField(default=0, help_text="Size in KB of the user's active files")
+    file_count = models.IntegerField(default=0)
+
+    @classmethod
+    def remaining_kb(cls, user, quota_kb):
+        used_kb = cls.objects.filter(user=user).values_list('used_kb', flat=True).first() or 0
+        return quota_kb - used_kb
+
+    @classmethod
+    def reserve(cls, user, size_kb, quota_kb):
+        # Check and increment in one UPDATE so concurrent uploads cannot overshoot the quota.
+        cls.objects.get_or_create(user=user)
+        return cls.objects.filter(user=user, used_kb__lte=quota_kb - size_kb).update(
+            used_kb=F('used_kb') + size_kb,
+            file_count=F('file_count') + 1
+        ) == 1
+
+    @classmethod
+    def release(cls, user, size_kb):
+        cls.objects.filter(user=user).update(
+            used_kb=Greatest(F('used_kb') - size_kb, 0),
+            file_count=Greatest(F('file_count') - 1, 0)
+        )
+
 class File(BaseModel):
     owner = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     file = models.FileField(upload_to='user_files/', null=True, blank=True)
     file_size_kb = models.BigIntegerField(null=True, help_text="Size in KB")
     last_opened = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='file_updated_at_id_idx'),
+        ]
+
     def __str__(self):
         return self.file.name if self.file else "Unnamed File"
+
+    def soft_delete(self):
+        # update() skips auto_now, so bump updated_at for the change feed.
+        now = timezone.now()
+        updated = File.objects.filter(pk=self.pk, status=True).update(status=False, updated_at=now)
+        self.status = False
+        self.updated_at = now
+        if updated and self.owner_id:
+            StorageUsage.release(self.owner_id, self.file_size_kb or 0)
@@ -1,8 +1,13 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
 from auth_app.models import UserRole
-from .models import File
+from .models import File, StorageUsage
+from unittest.mock import patch
 from share.views import fernet
 
 class SecureFileShareTests(TestCase):
@@ -37,7 +42,7 @@ class SecureFileShareTests(TestCase):
 
     def test_client_file_listing(self):
         self.client.force_login(self.client_user)
-        File.objects.create(owner=self.ops_user, file_name=self.valid_file, file_size_kb=1)
+        File.objects.create(owner=self.ops_user, file=self.valid_file, file_size_kb=1)
         self.assertEqual(len(self.client.get(self.list_url).json().get('files')), 1)
 
     def test_role_based_file_listing(self):
@@ -48,7 +53,7 @@ class SecureFileShareTests(TestCase):
 
     def test_file_download_link_and_token_validation(self):
         self.client.force_login(self.client_user)
-        file = File.objects.create(owner=self.ops_user, file_name=self.valid_file, file_size_kb=1)
+        file = File.objects.create(owner=self.ops_user, file=self.valid_file, file_size_kb=1)
         token = fernet.encrypt(f"{self.client_user.id}:{file.id}".encode()).decode()
         resp = self.client.get(f"{self.download_url}{file.id}/")
         self.assertIn("download-link", resp.json())
@@ -56,21 +61,110 @@ class SecureFileShareTests(TestCase):
 
     def test_invalid_secure_downloads(self):
         self.client.force_login(self.client_user)
-        file = File.objects.create(owner=self.ops_user, file_name=self.valid_file, file_size_kb=1)
+        file = File.objects.create(owner=self.ops_user, file=self.valid_file, file_size_kb=1)
         token = fernet.encrypt(f"{self.ops_user.id}:{file.id}".encode()).decode()
         self.assertEqual(self.client.get(f"/api/secure-download/{token}/").status_code, 403)
         self.assertEqual(self.client.get("/api/secure-download/invalid/" ).status_code, 400)
 
     def test_soft_delete_hides_files(self):
         self.client.force_login(self.client_user)
-        File.objects.create(owner=self.ops_user, file_name=self.valid_file, file_size_kb=1, status=False)
+        File.objects.create(owner=self.ops_user, file=self.valid_file, file_size_kb=1, status=False)
         self.assertEqual(len(self.client.get(self.list_url).json().get("files")), 0)
 
     def test_last_opened_updates_on_download(self):
         self.client.force_login(self.client_user)
-        file = File.objects.create(owner=self.ops_user, file_name=self.valid_file, file_size_kb=1)
+        file = File.objects.create(owner=self.ops_user, file=self.valid_file, file_size_kb=1)
         token = fernet.encrypt(f"{self.client_user.id}:{file.id}".encode()).decode()
         old_time = file.last_opened
         self.client.get(f"/api/secure-download/{token}/")
         file.refresh_from_db()
         self.assertNotEqual(file.last_opened, old_time)
+
+    def test_bulk_upload_reports_per_file_results(self):
+        self.client.force_login(self.ops_user)
+        invalid = SimpleUploadedFile("notes.txt", b"txt", content_type="text/plain")
+        resp = self.client.post('/api/bulk-upload/', {'files': [self.valid_file, invalid]}, format='multipart')
+        self.assertEqual(resp.status_code, 207)
+        results = resp.json()["results"]
+        self.assertEqual([r["status"] for r in results], ["uploaded", "failed"])
+        self.assertTrue(File.objects.filter(id=results[0]["file_id"]).exists())
+
+    def test_upload_file_stores_file_and_counts_usage(self):
+        self.client.force_login(self.ops_user)
+        resp = self.client.post('/api/upload/', {'file': SimpleUploadedFile("deck.pptx", b"x" * 4096)})
+        self.assertEqual(resp.status_code, 201)
+        self.assertTrue(File.objects.get(id=resp.json()["file_id"]).file.name.startswith("user_files/"))
+        usage = StorageUsage.objects.get(user=self.ops_user)
+        self.assertEqual((usage.used_kb, usage.file_count), (4, 1))
+
+    @override_settings(STORAGE_QUOTA_KB=1)
+    def test_upload_file_rejects_on_content_length_before_parsing(self):
+        self.client.force_login(self.ops_user)
+        with patch.object(StorageUsage, 'reserve') as reserve:
+            resp = self.client.post('/api/upload/', {'file': SimpleUploadedFile("deck.pptx", b"x" * 4096)})
+        self.assertEqual(resp.status_code, 413)
+        reserve.assert_not_called()
+        self.assertFalse(File.objects.exists())
+        self.assertEqual(self.client.post('/api/upload/', {}, CONTENT_LENGTH='abc').status_code, 400)
+
+    @override_settings(STORAGE_QUOTA_KB=4)
+    def test_upload_file_rejects_exact_size_over_quota(self):
+        # Another upload consumed the quota after the Content-Length check passed.
+        self.client.force_login(self.ops_user)
+        StorageUsage.objects.create(user=self.ops_user, used_kb=1, file_count=1)
+        with patch.object(StorageUsage, 'remaining_kb', return_value=10):
+            resp = self.client.post('/api/upload/', {'file': SimpleUploadedFile("deck.pptx", b"x" * 4096)})
+        self.assertEqual(resp.status_code, 413)
+        self.assertFalse(File.objects.exists())
+        self.assertEqual(StorageUsage.objects.get(user=self.ops_user).used_kb, 1)
+
+    @override_settings(STORAGE_QUOTA_KB=1)
+    def test_bulk_upload_rejects_files_over_quota(self):
+        self.client.force_login(self.ops_user)
+        large = SimpleUploadedFile("deck.pptx", b"x" * 4096)
+        resp = self.client.post('/api/bulk-upload/', {'files': [large]}, format='multipart')
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("quota", resp.json()["results"][0]["message"].lower())
+        self.assertFalse(File.objects.exists())
+
+    def test_storage_usage_tracks_soft_delete_and_reconcile(self):
+        self.client.force_login(self.ops_user)
+        self.client.post('/api/bulk-upload/', {'files': [SimpleUploadedFile("deck.pptx", b"x" * 4096)]}, format='multipart')
+        usage = StorageUsage.objects.get(user=self.ops_user)
+        self.assertEqual((usage.used_kb, usage.file_count), (4, 1))
+
+        File.objects.get().soft_delete()
+        usage.refresh_from_db()
+        self.assertEqual((usage.used_kb, usage.file_count), (0, 0))
+
+        StorageUsage.objects.filter(user=self.ops_user).update(used_kb=99, file_count=9)
+        out = StringIO()
+        call_command('reconcile_storage_usage', batch_size=1, stdout=out)
+        self.assertIn("Reconciled storage usage for 2 users.", out.getvalue())
+        usage.refresh_from_db()
+        self.assertEqual((usage.used_kb, usage.file_count), (0, 0))
+
+    def test_change_feed_returns_updates_and_tombstones_after_cursor(self):
+        self.client.force_login(self.client_user)
+        settled = timezone.now() - timedelta(minutes=1)
+        first = File.objects.create(owner=self.ops_user, file_size_kb=1)
+        second = File.objects.create(owner=self.ops_user, file_size_kb=2)
+        File.objects.filter(id__in=[first.id, second.id]).update(updated_at=settled)
+
+        resp = self.client.get('/api/files/changes/', {'limit': 1})
+        self.assertEqual([c["id"] for c in resp.json()["changes"]], [first.id])
+        self.assertTrue(resp.json()["has_more"])
+        cursor = resp.json()["cursor"]
+
+        resp = self.client.get('/api/files/changes/', {'cursor': cursor})
+        self.assertEqual([c["id"] for c in resp.json()["changes"]], [second.id])
+        cursor = resp.json()["cursor"]
+
+        first.soft_delete()
+        File.objects.filter(id=first.id).update(updated_at=timezone.now() - timedelta(seconds=30))
+        resp = self.client.get('/api/files/changes/', {'cursor': cursor})
+        tombstone = resp.json()["changes"][0]
+        self.assertEqual((tombstone["id"], tombstone["deleted"]), (first.id, True))
+        self.assertNotIn("file_name", tombstone)
+        for bad_cursor in ['bogus', '99999999999999999999-1', '300000000000000000-1']:
+            self.assertEqual(self.client.get('/api/files/changes/', {'cursor': bad_cursor}).status_code, 400)
@@ -3,7 +3,9 @@ from . import views
 
 urlpatterns = [
     path('upload/', views.upload_file, name='upload_file'),
+    path('bulk-upload/', views.bulk_upload_files, name='bulk_upload_files'),
     path('files/', views.list_files, name='list_files'),
+    path('files/changes/', views.list_file_changes, name='list_file_changes'),
     path('download/<int:file_id>/', views.download_file, name='download_file'),
     path('secure-download/<str:token>/', views.secure_download, name='secure_download'),
 ]
@@ -1,24 +1,41 @@
 import os
 import json
 import datetime
+from datetime import timedelta, timezone as dt_timezone
+from concurrent.futures import ThreadPoolExecutor
 from cryptography.fernet import Fernet
 from django.http import JsonResponse, FileResponse, HttpResponseForbidden
 from django.contrib.auth.decorators import login_required
 from django.urls import reverse
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from django.core.files.storage import default_storage
 from auth_app.models import UserRole
-from .models import File
+from .models import File, StorageUsage
 
 # Constants
 ALLOWED_EXTENSIONS = ['.pptx', '.docx', '.xlsx']
 OPS_ROLE = 'Ops'
 CLIENT_ROLE = 'Client'
+BULK_UPLOAD_MAX_FILES = 50
+BULK_UPLOAD_MAX_WORKERS = 4
+CHANGE_FEED_DEFAULT_LIMIT = 100
+CHANGE_FEED_MAX_LIMIT = 500
+# Rows newer than this may still belong to uncommitted transactions with an
+# earlier updated_at, so the feed holds them back until they have settled.
+CHANGE_FEED_SETTLE_SECONDS = 2
 
-# Securely load FERNET key
-FERNET_KEY = os.environ.get('FERNET_KEY')
-if not FERNET_KEY:
-    raise RuntimeError("FERNET_KEY environment variable not set.")
-fernet = Fernet(FERNET_KEY)
+# Securely load FERNET key on first use, so importing views does not require it
+def build_fernet():
+    fernet_key = os.environ.get('FERNET_KEY')
+    if not fernet_key:
+        raise RuntimeError("FERNET_KEY environment variable not set.")
+    return Fernet(fernet_key)
+
+fernet = SimpleLazyObject(build_fernet)
 
 # Utils
 def get_user_role(user):
@@ -29,6 +46,30 @@ def is_valid_file(file):
     ext = os.path.splitext(file.name)[1].lower()
     return ext in ALLOWED_EXTENSIONS
 
+def store_file(file):
+    name = File._meta.get_field('file').generate_filename(None, file.name)
+    return default_storage.save(name, file)
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+def encode_change_cursor(updated_at, file_id):
+    micros = (updated_at - EPOCH) // timedelta(microseconds=1)
+    return f'{micros}-{file_id}'
+
+def decode_change_cursor(cursor):
+    micros, file_id = cursor.split('-')
+    return EPOCH + timedelta(microseconds=int(micros)), int(file_id)
+
+def serialize_change(file_obj):
+    change = {'id': file_obj.id, 'deleted': not file_obj.status, 'updated_at': file_obj.updated_at}
+    if file_obj.status:
+        change.update(
+            file_name=os.path.basename(file_obj.file.name) if file_obj.file else None,
+            file_size_kb=file_obj.file_size_kb,
+            last_opened=file_obj.last_opened
+        )
+    return change
+
 # Views
 @login_required
 def upload_file(request):
@@ -39,6 +80,15 @@ def upload_file(request):
     if get_user_role(user) != OPS_ROLE:
         return HttpResponseForbidden("Only Ops users can upload files.")
 
+    # Reject on the declared body size before request.FILES spools the upload to disk.
+    quota_kb = settings.STORAGE_QUOTA_KB
+    try:
+        content_length_kb = int(request.META.get('CONTENT_LENGTH') or 0) // 1024
+    except ValueError:
+        return JsonResponse({'message': 'Invalid Content-Length header.'}, status=400)
+    if content_length_kb > StorageUsage.remaining_kb(user, quota_kb):
+        return JsonResponse({'message': 'Storage quota exceeded.'}, status=413)
+
     file = request.FILES.get('file')
     if not file:
         return JsonResponse({'message': 'No file provided.'}, status=400)
@@ -46,17 +96,102 @@ def upload_file(request):
     if not is_valid_file(file):
         return JsonResponse({'message': 'Invalid file type.'}, status=400)
 
-    saved_file = File.objects.create(
-        owner=user,
-        file_name=file,
-        file_size_kb=file.size // 1024
-    )
+    # The reservation's row lock is held until the File row commits, so
+    # reconcile_storage_usage never sees one without the other; a failure
+    # rolls the reservation back.
+    size_kb = file.size // 1024
+    stored_name = None
+    try:
+        with transaction.atomic():
+            if not StorageUsage.reserve(user, size_kb, quota_kb):
+                return JsonResponse({'message': 'Storage quota exceeded.'}, status=413)
+            stored_name = store_file(file)
+            saved_file = File.objects.create(
+                owner=user,
+                file=stored_name,
+                file_size_kb=size_kb
+            )
+    except Exception:
+        if stored_name:
+            default_storage.delete(stored_name)
+        raise
 
     return JsonResponse({
         'message': 'File uploaded successfully.',
         'file_id': saved_file.id
     }, status=201)
 
+@login_required
+def bulk_upload_files(request):
+    if request.method != 'POST':
+        return JsonResponse({'message': 'Invalid request method.'}, status=405)
+
+    user = request.user
+    if get_user_role(user) != OPS_ROLE:
+        return HttpResponseForbidden("Only Ops users can upload files.")
+
+    files = request.FILES.getlist('files')
+    if not files:
+        return JsonResponse({'message': 'No files provided.'}, status=400)
+    if len(files) > BULK_UPLOAD_MAX_FILES:
+        return JsonResponse({'message': f'At most {BULK_UPLOAD_MAX_FILES} files per request.'}, status=400)
+
+    quota_kb = settings.STORAGE_QUOTA_KB
+    results = [{'file_name': file.name} for file in files]
+    stored = []
+    # As in upload_file, reservations and the File rows commit together; if
+    # bulk_create fails the reservations roll back and stored files are removed.
+    try:
+        with transaction.atomic():
+            valid = []
+            for result, file in zip(results, files):
+                if not is_valid_file(file):
+                    result.update(status='failed', message='Invalid file type.')
+                elif not StorageUsage.reserve(user, file.size // 1024, quota_kb):
+                    result.update(status='failed', message='Storage quota exceeded.')
+                else:
+                    valid.append((result, file))
+
+            # Storage writes are I/O bound, so run them in parallel; each write
+            # succeeds or fails on its own.
+            with ThreadPoolExecutor(max_workers=BULK_UPLOAD_MAX_WORKERS) as executor:
+                futures = [(result, file, executor.submit(store_file, file)) for result, file in valid]
+
+            for result, file, future in futures:
+                try:
+                    stored_name = future.result()
+                except Exception:
+                    StorageUsage.release(user, file.size // 1024)
+                    result.update(status='failed', message='Could not store file.')
+                    continue
+                stored.append((result, File(owner=user, file=stored_name, file_size_kb=file.size // 1024)))
+
+            created = File.objects.bulk_create([file_obj for _, file_obj in stored])
+    except Exception:
+        for _, file_obj in stored:
+            default_storage.delete(file_obj.file.name)
+        raise
+    if any(file_obj.pk is None for file_obj in created):
+        # MySQL does not return primary keys from bulk inserts; stored names
+        # are unique, so look them up instead.
+        ids = dict(File.objects.filter(file__in=[f.file.name for f in created]).values_list('file', 'id'))
+        for file_obj in created:
+            file_obj.pk = ids.get(file_obj.file.name)
+    for result, file_obj in stored:
+        result.update(status='uploaded', file_id=file_obj.pk)
+
+    uploaded = len(stored)
+    if uploaded == len(files):
+        status = 201
+    elif uploaded:
+        status = 207
+    else:
+        status = 400
+    return JsonResponse({
+        'message': f'{uploaded} of {len(files)} files uploaded.',
+        'results': results
+    }, status=status)
+
 @login_required
 def list_files(request):
     user = request.user
@@ -67,7 +202,7 @@ def list_files(request):
     file_list = [
         {
             'id': f.id,
-            'file_name': os.path.basename(f.file_name.name),
+            'file_name': os.path.basename(f.file.name),
             'file_size_kb': f.file_size_kb,
             'last_opened': f.last_opened
         }
@@ -75,6 +210,39 @@ def list_files(request):
     ]
     return JsonResponse({'files': file_list}, status=200)
 
+@login_required
+def list_file_changes(request):
+    user = request.user
+    if get_user_role(user) != CLIENT_ROLE:
+        return HttpResponseForbidden("Only Client users can list files.")
+
+    cursor = request.GET.get('cursor')
+    try:
+        limit = min(int(request.GET.get('limit', CHANGE_FEED_DEFAULT_LIMIT)), CHANGE_FEED_MAX_LIMIT)
+        after = decode_change_cursor(cursor) if cursor else None
+    except (ValueError, OverflowError):
+        return JsonResponse({'message': 'Invalid cursor or limit.'}, status=400)
+    if limit < 1:
+        return JsonResponse({'message': 'Invalid cursor or limit.'}, status=400)
+
+    # Range scan on the (updated_at, id) index; soft-deleted rows are
+    # included so clients can drop them.
+    files = File.objects.filter(
+        updated_at__lte=timezone.now() - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)
+    )
+    if after:
+        updated_at, file_id = after
+        files = files.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=file_id))
+    files = list(files.order_by('updated_at', 'id')[:limit + 1])
+
+    has_more = len(files) > limit
+    files = files[:limit]
+    changes = [serialize_change(f) for f in files]
+    if files:
+        cursor = encode_change_cursor(files[-1].updated_at, files[-1].id)
+
+    return JsonResponse({'changes': changes, 'cursor': cursor, 'has_more': has_more}, status=200)
+
 @login_required
 def download_file(request, file_id):
     user = request.user
@@ -112,7 +280,7 @@ def secure_download(request, token):
     except Exception:
         return JsonResponse({'message': 'Invalid or expired download link.'}, status=400)
 
-    file_path = file_obj.file_name.path
+    file_path = file_obj.file.path
     if not os.path.exists(file_path):
         return JsonResponse({'message': 'File no longer exists.'}, status=404)
 